@@ -1,8 +1,6 @@
 """Azure DevOps Harvester - Search repositories and files."""
 
-from azdo_harvest.search import AzureDevOpsSearcher
-from azdo_harvest.models import FileResult, RepositoryResult
-from azdo_harvest.downloader import FileDownloader
+import importlib
 
 __version__ = "0.1.0"
 __all__ = [
@@ -11,3 +9,26 @@ __all__ = [
     "RepositoryResult",
     "FileDownloader"
 ]
+
+# Public names are imported on first access, so that e.g. importing
+# azdo_harvest.models doesn't pull in requests (or the CLI's rich/click)
+_EXPORTS = {
+    "AzureDevOpsSearcher": "azdo_harvest.search",
+    "FileResult": "azdo_harvest.models",
+    "RepositoryResult": "azdo_harvest.models",
+    "FileDownloader": "azdo_harvest.downloader",
+}
+
+
+def __getattr__(name):
+    """Import a public name from its submodule on first access."""
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """List module attributes including the not-yet-imported exports."""
+    return sorted(set(globals()) | set(__all__))
@@ -1,16 +1,17 @@
 """CLI interface for Azure DevOps Harvester."""
 import click
-import hashlib
+import functools
 from rich.console import Console
-from rich.table import Table
-from rich.progress import (
-    Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-)
 from azdo_harvest.search import AzureDevOpsSearcher
+from azdo_harvest.downloader import unique_file_results
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-console = Console()
+
+@functools.lru_cache(maxsize=1)
+def get_console():
+    """Return the shared Rich console, creating it on first use."""
+    return Console()
 
 
 @click.group()
@@ -51,9 +52,13 @@ def main():
     '--output-dir', default='./downloads',
     help='Directory to save downloaded files'
 )
+@click.option(
+    '--workers', '-w', default=16, type=click.IntRange(min=1),
+    help='Number of parallel download workers'
+)
 @click.option('--verbose', '-v', is_flag=True, help='Show detailed results')
 def search(search_term, organization, project, pat, file_only, repo_only,
-           limit, download, output_dir, verbose):
+           limit, download, output_dir, workers, verbose):
     """Search for repositories and files in Azure DevOps.
 
     SEARCH_TERM: The term to search for in repositories and files.
@@ -62,6 +67,7 @@ def search(search_term, organization, project, pat, file_only, repo_only,
         azdo-harvest search "TODO" --organization myorg --pat xxxxx
         azdo-harvest search "file:Dockerfile" -o myorg -p myproject --download
     """
+    console = get_console()
     console.print(f"[bold blue]Searching for:[/bold blue] {search_term}")
     console.print(f"[bold blue]Organization:[/bold blue] {organization}")
     if project:
@@ -83,7 +89,9 @@ def search(search_term, organization, project, pat, file_only, repo_only,
 
         # Download files if requested
         if download and results.get('files'):
-            download_files_parallel(searcher, results['files'], output_dir)
+            download_files_parallel(
+                searcher, results['files'], output_dir, max_workers=workers
+            )
 
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
@@ -92,6 +100,7 @@ def search(search_term, organization, project, pat, file_only, repo_only,
 
 def display_results(results, verbose=False):
     """Display search results in a formatted table."""
+    console = get_console()
 
     # Summary counts
     repo_count = len(results.get('repositories', []))
@@ -106,6 +115,8 @@ def display_results(results, verbose=False):
 
     # Only show detailed tables if verbose mode is enabled
     if verbose:
+        from rich.table import Table
+
         # Display repository results
         if results.get('repositories'):
             console.print(
@@ -116,12 +127,9 @@ def display_results(results, verbose=False):
             repo_table.add_column("Project", style="green")
             repo_table.add_column("URL", style="blue")
 
+            # Search results are already normalized with 'N/A' fallbacks
             for repo in results['repositories']:
-                repo_table.add_row(
-                    repo.get('name', 'N/A'),
-                    repo.get('project', 'N/A'),
-                    repo.get('url', 'N/A')
-                )
+                repo_table.add_row(repo['name'], repo['project'], repo['url'])
 
             console.print(repo_table)
             console.print(
@@ -137,13 +145,9 @@ def display_results(results, verbose=False):
             file_table.add_column("File Path", style="yellow")
             file_table.add_column("Branch", style="green")
 
-            for file_result in results['files']:
-                # FileResult objects have attributes, not dict keys
-                file_table.add_row(
-                    file_result.repository,
-                    file_result.filepath,
-                    file_result.branch
-                )
+            # FileResult objects have attributes, not dict keys
+            for fr in results['files']:
+                file_table.add_row(fr.repository, fr.filepath, fr.branch)
 
             console.print(file_table)
             console.print(
@@ -155,21 +159,38 @@ def display_results(results, verbose=False):
         console.print("[yellow]No results found.[/yellow]")
 
 
-def download_files_parallel(searcher, file_results, output_dir):
+def download_files_parallel(searcher, file_results, output_dir,
+                            max_workers=16):
     """Download files in parallel using ThreadPoolExecutor.
 
     Args:
         searcher: AzureDevOpsSearcher instance with downloader
         file_results: List of FileResult objects
         output_dir: Directory to save files
+        max_workers: Maximum number of concurrent downloads
     """
+    # Deferred so that `--help` and searches without --download skip it
+    from rich.progress import (
+        Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    )
+
+    console = get_console()
+
+    # The same file version can appear more than once in search results
+    found_count = len(file_results)
+    file_results = unique_file_results(file_results)
+    duplicate_count = found_count - len(file_results)
+
     console.print(
         f"\n[bold cyan]Downloading {len(file_results)} files to "
         f"{output_dir}...[/bold cyan]\n"
     )
 
-    # Create output directory
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    # Create output directory; workers join names onto this plain string
+    # rather than building a Path per file
+    output_root = Path(output_dir).resolve()
+    output_root.mkdir(parents=True, exist_ok=True)
+    output_root = str(output_root)
 
     downloaded = []
     failed = []
@@ -177,40 +198,10 @@ def download_files_parallel(searcher, file_results, output_dir):
     def download_single_file(file_result):
         """Download a single file with custom naming including hash."""
         try:
-            # Download to temporary location first
-            url = file_result.get_download_url()
-
-            import requests
-            response = requests.get(
-                url,
-                headers=searcher.downloader.headers,
-                timeout=30
+            file_path, hash_prefix = searcher.downloader.download_file_hashed(
+                file_result, output_root
             )
-            response.raise_for_status()
-
-            content = response.text
-            file_hash = hashlib.sha256(
-                content.encode('utf-8')
-            ).hexdigest()
-            hash_prefix = file_hash[:8]
-            safe_repo = file_result.repository.replace('/', '_')
-            filename = file_result.filename.replace('/', '_')
-
-            if '.' in filename:
-                name_part, ext_part = filename.rsplit('.', 1)
-                custom_filename = (
-                    f"{safe_repo}__{name_part}__"
-                    f"{hash_prefix}.{ext_part}"
-                )
-            else:
-                custom_filename = (
-                    f"{safe_repo}__{filename}__{hash_prefix}"
-                )
-
-            file_path = Path(output_dir) / custom_filename
-            file_path.write_text(content, encoding='utf-8')
-
-            return (file_result, str(file_path), hash_prefix, None)
+            return (file_result, file_path, hash_prefix, None)
         except Exception as e:
             return (file_result, None, None, str(e))
 
@@ -224,8 +215,15 @@ def download_files_parallel(searcher, file_results, output_dir):
     ) as progress:
         task = progress.add_task("Downloading...", total=len(file_results))
 
-        # Download with 5 parallel workers
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        # Workers share the downloader's pooled session; never run more
+        # workers than the pool keeps alive, or connections get discarded
+        # and re-handshaked instead of reused
+        workers = max(1, min(
+            max_workers,
+            searcher.downloader.max_connections,
+            len(file_results)
+        ))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
             futures = {
                 executor.submit(download_single_file, fr): fr
                 for fr in file_results
@@ -247,6 +245,10 @@ def download_files_parallel(searcher, file_results, output_dir):
         f"[bold green]✓[/bold green] Successfully downloaded: "
         f"[bold]{len(downloaded)}[/bold] files"
     )
+    if duplicate_count:
+        console.print(
+            f"[dim]Skipped {duplicate_count} duplicate results[/dim]"
+        )
     if failed:
         console.print(
             f"[bold red]✗[/bold red] Failed: "
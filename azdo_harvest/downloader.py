@@ -1,21 +1,209 @@
 """File download functionality for Azure DevOps."""
+import codecs
+import hashlib
+import json
+import logging
+import os
+import posixpath
 import requests
+import shutil
+import tempfile
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-from azdo_harvest.models import FileResult
+from typing import Callable, Dict, List, Optional, Tuple
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.util.retry import Retry
+from azdo_harvest.models import DEFAULT_API_VERSION, FileResult
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Records the commit each file in an output directory was downloaded from
+MANIFEST_NAME = ".azdo-harvest.json"
+
+
+def hashed_filename(repository: str, filename: str, hash_prefix: str) -> str:
+    """Build a flat, collision-resistant name for a downloaded file.
+
+    Args:
+        repository: Repository the file belongs to
+        filename: Original file name
+        hash_prefix: Short content hash to embed in the name
+
+    Returns:
+        Name in the form ``{repository}__{name}__{hash}.{ext}``
+    """
+    safe_repo = repository.replace('/', '_')
+    filename = filename.replace('/', '_')
+
+    name_part, dot, ext_part = filename.rpartition('.')
+    if dot:
+        return f"{safe_repo}__{name_part}__{hash_prefix}.{ext_part}"
+    return f"{safe_repo}__{filename}__{hash_prefix}"
+
+
+def stream_to_part_file(response, directory, hasher=None) -> str:
+    """Stream a response body into a new, uniquely named file.
+
+    The ``.part`` file is created next to its final destination so the
+    caller can move it into place with os.replace; concurrent writers
+    of the same destination then never interleave their bytes.
+
+    Args:
+        response: Streamed requests.Response to read from
+        directory: Existing directory to create the file in
+        hasher: Optional hashlib object updated with every chunk
+
+    Returns:
+        Path of the written ``.part`` file
+    """
+    part_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    try:
+        with open(part_path, 'xb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if hasher is not None:
+                    hasher.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return part_path
+
+
+def load_manifest(output_dir: Path) -> Dict[str, str]:
+    """Read the download manifest of an output directory.
+
+    Args:
+        output_dir: Directory files were downloaded to
+
+    Returns:
+        Mapping of relative file path to commit id; empty when the
+        manifest is missing, unreadable or not a JSON object
+    """
+    try:
+        with open(output_dir / MANIFEST_NAME, 'rb') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(output_dir: Path, manifest: Dict[str, str]) -> None:
+    """Write the download manifest of an output directory.
+
+    Args:
+        output_dir: Directory files were downloaded to
+        manifest: Mapping of relative file path to commit id
+    """
+    with open(output_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _manifest_key(base_path: Path, file_path: Path) -> str:
+    """Manifest entry name of a file: its path relative to base_path."""
+    return file_path.relative_to(base_path).as_posix()
+
+
+def _is_unchanged(
+    manifest: Dict[str, str],
+    base_path: Path,
+    file_result: FileResult,
+    file_path: Path
+) -> bool:
+    """Whether file_path was already downloaded from this commit."""
+    return bool(
+        file_result.commit_id
+        and manifest.get(_manifest_key(base_path, file_path))
+        == file_result.commit_id
+        and file_path.exists()
+    )
+
+
+def unique_file_results(file_results: List[FileResult]) -> List[FileResult]:
+    """Drop results that point at the same file version.
+
+    Search can return the same file more than once; two results are the
+    same download when repository, commit (or branch when the commit is
+    unknown) and path all match.
+
+    Args:
+        file_results: List of FileResult objects
+
+    Returns:
+        The first occurrence of each distinct file, in original order
+    """
+    seen = set()
+    unique = []
+    for file_result in file_results:
+        key = (
+            file_result.repository_id or file_result.repository,
+            file_result.commit_id or file_result.branch,
+            file_result.filepath
+        )
+        if key not in seen:
+            seen.add(key)
+            unique.append(file_result)
+    return unique
 
 
 class FileDownloader:
     """Download files from Azure DevOps using the Git Items API."""
 
-    def __init__(self, headers: dict):
+    def __init__(
+        self,
+        headers: dict,
+        max_connections: Optional[int] = None,
+        session: Optional[requests.Session] = None
+    ):
         """Initialize the file downloader.
 
         Args:
             headers: Authentication headers to use for API requests
+            max_connections: Number of keep-alive connections to pool
+                (default: 32). With a supplied session, pass the pool
+                size of its adapters; when unset, requests' default pool
+                size is assumed
+            session: Optional pre-configured session to use; the
+                authentication headers are added to it and its adapters
+                are left as they are
         """
         self.headers = headers
 
+        if session is not None:
+            # Callers size their worker pools from max_connections, so it
+            # has to describe the pool mounted on the caller's session
+            if max_connections is None:
+                max_connections = DEFAULT_POOLSIZE
+            self.max_connections = max_connections
+            self.session = session
+            self.session.headers.update(headers)
+            return
+
+        if max_connections is None:
+            max_connections = 32
+        self.max_connections = max_connections
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+
+        # Keep-alive connections are reused across requests, with one pool
+        # each for dev.azure.com and almsearch.dev.azure.com; transient
+        # throttling/server errors are retried.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=max_connections,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+
     def download_file(
         self,
         file_result: FileResult,
@@ -36,39 +224,118 @@ class FileDownloader:
             custom_filename: Optional custom filename (overrides
                 preserve_structure)
 
+        Returns:
+            Path to the downloaded file
+        """
+        file_path = self._target_path(
+            file_result, output_dir, preserve_structure, custom_filename
+        )
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._download_to(file_result, file_path)
+
+    def _target_path(
+        self,
+        file_result: FileResult,
+        output_dir: Optional[str],
+        preserve_structure: bool,
+        custom_filename: Optional[str] = None
+    ) -> Path:
+        """Work out where download_file saves a file.
+
+        Args:
+            file_result: FileResult object with download information
+            output_dir: Directory to save file (default: current directory)
+            preserve_structure: If True, preserve repository path structure
+            custom_filename: Optional custom filename
+
+        Returns:
+            Destination path of the file
+        """
+        if output_dir:
+            base_path = Path(output_dir)
+        else:
+            base_path = Path.cwd()
+
+        if custom_filename:
+            return base_path / custom_filename
+        if preserve_structure:
+            repo_path = file_result.repository
+            file_subpath = file_result.filepath.lstrip('/')
+            return base_path / repo_path / file_subpath
+        return base_path / file_result.filename
+
+    def _download_to(self, file_result: FileResult, file_path: Path) -> str:
+        """Stream a file into file_path, whose directory must exist.
+
+        Args:
+            file_result: FileResult object with download information
+            file_path: Destination path of the file
+
         Returns:
             Path to the downloaded file
         """
         url = file_result.get_download_url()
+        part_path = None
 
         try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=30
+            response = self.session.get(url, timeout=30, stream=True)
+
+            with response:
+                response.raise_for_status()
+                part_path = stream_to_part_file(response, file_path.parent)
+            os.replace(part_path, file_path)
+
+            return str(file_path)
+
+        except (requests.exceptions.RequestException, OSError) as e:
+            if part_path and os.path.exists(part_path):
+                os.remove(part_path)
+            raise Exception(
+                f"Failed to download {file_result.filepath}: {str(e)}"
             )
-            response.raise_for_status()
 
-            if output_dir:
-                base_path = Path(output_dir)
-            else:
-                base_path = Path.cwd()
-
-            if custom_filename:
-                file_path = base_path / custom_filename
-            elif preserve_structure:
-                repo_path = file_result.repository
-                file_subpath = file_result.filepath.lstrip('/')
-                file_path = base_path / repo_path / file_subpath
-            else:
-                file_path = base_path / file_result.filename
+    def download_file_hashed(
+        self,
+        file_result: FileResult,
+        output_dir: str
+    ) -> Tuple[str, str]:
+        """Download a file under a name that embeds its content hash.
 
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(response.text, encoding='utf-8')
+        The body is streamed to a temporary file in ``output_dir`` while
+        being hashed, then renamed once the hash (and so the final name)
+        is known.
 
-            return str(file_path)
+        Args:
+            file_result: FileResult object with download information
+            output_dir: Existing directory to save the file in
 
-        except requests.exceptions.RequestException as e:
+        Returns:
+            Tuple of (path to the downloaded file, 8-char SHA256 prefix)
+        """
+        url = file_result.get_download_url()
+        part_path = None
+
+        try:
+            response = self.session.get(url, timeout=30, stream=True)
+
+            # The hash only disambiguates filenames, so it is marked
+            # usedforsecurity=False
+            hasher = hashlib.new('sha256', usedforsecurity=False)
+            with response:
+                response.raise_for_status()
+                part_path = stream_to_part_file(response, output_dir, hasher)
+
+            hash_prefix = hasher.hexdigest()[:8]
+            file_path = os.path.join(output_dir, hashed_filename(
+                file_result.repository, file_result.filename, hash_prefix
+            ))
+            os.replace(part_path, file_path)
+
+            return file_path, hash_prefix
+
+        except (requests.exceptions.RequestException, OSError) as e:
+            if part_path and os.path.exists(part_path):
+                os.remove(part_path)
             raise Exception(
                 f"Failed to download {file_result.filepath}: {str(e)}"
             )
@@ -77,53 +344,266 @@ class FileDownloader:
         self,
         file_results: list[FileResult],
         output_dir: Optional[str] = None,
-        preserve_structure: bool = True
+        preserve_structure: bool = True,
+        max_workers: int = 8,
+        skip_unchanged: bool = False
     ) -> dict[str, str]:
-        """Download multiple files from Azure DevOps.
+        """Download multiple files from Azure DevOps in parallel.
 
         Args:
             file_results: List of FileResult objects
             output_dir: Directory to save files (default: current directory)
             preserve_structure: If True, preserve repository path structure
+            max_workers: Maximum number of concurrent downloads; capped by
+                the connection pool size
+            skip_unchanged: If True, skip files whose local copy was
+                downloaded from the same commit by a previous run, as
+                recorded in a manifest file in the output directory
 
         Returns:
-            Dictionary mapping source path to downloaded file path
+            Dictionary mapping source path to downloaded file path, in the
+            order of file_results
         """
-        downloaded = {}
+        if not file_results:
+            return {}
 
-        for file_result in file_results:
+        base_path = Path(output_dir) if output_dir else Path.cwd()
+        targets = [
+            self._target_path(file_result, output_dir, preserve_structure)
+            for file_result in file_results
+        ]
+        # Files often share directories; create each one once up front
+        for directory in {target.parent for target in targets}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        manifest = load_manifest(base_path) if skip_unchanged else {}
+
+        def download_one(file_result, file_path):
+            if skip_unchanged and _is_unchanged(
+                manifest, base_path, file_result, file_path
+            ):
+                return str(file_path)
             try:
-                output_path = self.download_file(
-                    file_result,
-                    output_dir,
-                    preserve_structure
-                )
-                downloaded[str(file_result)] = output_path
+                return self._download_to(file_result, file_path)
             except Exception as e:
-                print(f"Error downloading {file_result}: {e}")
-                downloaded[str(file_result)] = None
+                logger.warning("Error downloading %s: %s", file_result, e)
+                return None
+
+        workers = max(1, min(
+            max_workers, self.max_connections, len(file_results)
+        ))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            output_paths = list(
+                executor.map(download_one, file_results, targets)
+            )
+
+        if skip_unchanged:
+            for file_result, file_path, output_path in zip(
+                file_results, targets, output_paths
+            ):
+                if output_path and file_result.commit_id:
+                    key = _manifest_key(base_path, file_path)
+                    manifest[key] = file_result.commit_id
+            save_manifest(base_path, manifest)
+
+        return {
+            str(file_result): output_path
+            for file_result, output_path in zip(file_results, output_paths)
+        }
+
+    def download_tree(
+        self,
+        file_results: list[FileResult],
+        output_dir: Optional[str] = None,
+        skip_unchanged: bool = False
+    ) -> dict[str, str]:
+        """Download files from one repository folder as a single zip.
+
+        Fetches the deepest folder containing all of file_results with
+        one Git Items API request (``recursionLevel=Full``,
+        ``$format=zip``) and extracts just those files, laid out as
+        download_file does with preserve_structure=True. Only worth it
+        for several files under a narrow folder, since the whole folder
+        is transferred.
+
+        Args:
+            file_results: FileResult objects from the same repository
+                and branch
+            output_dir: Directory to save files (default: current directory)
+            skip_unchanged: If True, leave out files the output
+                directory's manifest shows as downloaded from the same
+                commit (see download_files); no request is made when
+                none are left
+
+        Returns:
+            Dictionary mapping source path to downloaded file path (None
+            for files missing from the archive), in the order of
+            file_results
+        """
+        if not file_results:
+            return {}
+
+        first = file_results[0]
+        repo_identifier = first.repository_id or first.repository
+        if any(
+            (fr.repository_id or fr.repository, fr.branch)
+            != (repo_identifier, first.branch)
+            for fr in file_results
+        ):
+            raise ValueError(
+                "download_tree needs files from one repository and branch"
+            )
+
+        if not skip_unchanged:
+            return self._fetch_tree(file_results, output_dir)
+
+        base_path = Path(output_dir) if output_dir else Path.cwd()
+        manifest = load_manifest(base_path)
+        downloaded = {}
+        stale = []
+        for file_result in file_results:
+            file_path = self._target_path(file_result, output_dir, True)
+            if _is_unchanged(manifest, base_path, file_result, file_path):
+                downloaded[str(file_result)] = str(file_path)
+            else:
+                stale.append(file_result)
+
+        if stale:
+            downloaded.update(self._fetch_tree(stale, output_dir))
+            for file_result in stale:
+                output_path = downloaded[str(file_result)]
+                if output_path and file_result.commit_id:
+                    key = _manifest_key(base_path, Path(output_path))
+                    manifest[key] = file_result.commit_id
+            save_manifest(base_path, manifest)
+
+        return {
+            str(file_result): downloaded[str(file_result)]
+            for file_result in file_results
+        }
+
+    def _fetch_tree(
+        self,
+        file_results: list[FileResult],
+        output_dir: Optional[str]
+    ) -> dict[str, str]:
+        """Request the folder zip for download_tree and extract from it."""
+        first = file_results[0]
+        scope_path = posixpath.commonpath(
+            [posixpath.dirname(fr.filepath) for fr in file_results]
+        )
+        url = first.get_items_url()
+        params = {
+            "scopePath": scope_path,
+            "recursionLevel": "Full",
+            "versionDescriptor.version": first.branch,
+            "$format": "zip",
+            "download": "true",
+            "api-version": DEFAULT_API_VERSION
+        }
+
+        try:
+            response = self.session.get(
+                url, params=params, timeout=30, stream=True
+            )
+
+            with response, tempfile.TemporaryFile() as archive_file:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    archive_file.write(chunk)
+                archive_file.seek(0)
+                return self._extract_files(
+                    archive_file, file_results, scope_path, output_dir
+                )
+
+        except (requests.exceptions.RequestException, zipfile.BadZipFile) as e:
+            raise Exception(
+                f"Failed to download {scope_path} from "
+                f"{first.repository}: {str(e)}"
+            )
+
+    def _extract_files(
+        self,
+        archive_file,
+        file_results: list[FileResult],
+        scope_path: str,
+        output_dir: Optional[str]
+    ) -> dict[str, str]:
+        """Copy the requested files out of a folder zip archive.
+
+        Entries are looked up exactly by their path relative to
+        scope_path, under the archive's top-level prefix: either none,
+        or the scope folder's own name when the archive includes it.
+        """
+        downloaded = {}
+        with zipfile.ZipFile(archive_file) as archive:
+            names = {name for name in archive.namelist()
+                     if not name.endswith('/')}
+            relatives = [
+                posixpath.relpath(file_result.filepath, scope_path)
+                for file_result in file_results
+            ]
+
+            folder = posixpath.basename(scope_path.rstrip('/'))
+            prefixes = [''] + ([folder + '/'] if folder else [])
+            prefix = max(prefixes, key=lambda candidate: sum(
+                candidate + relative in names for relative in relatives
+            ))
+
+            for file_result, relative in zip(file_results, relatives):
+                entry = prefix + relative
+                if entry not in names:
+                    logger.warning("%s missing from archive", file_result)
+                    downloaded[str(file_result)] = None
+                    continue
+
+                file_path = self._target_path(file_result, output_dir, True)
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                with archive.open(entry) as src, open(file_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                downloaded[str(file_result)] = str(file_path)
 
         return downloaded
 
-    def get_file_content(self, file_result: FileResult) -> str:
+    def get_file_content(
+        self,
+        file_result: FileResult,
+        writer: Optional[Callable[[str], object]] = None
+    ) -> Optional[str]:
         """Get file content without saving to disk.
 
         Args:
             file_result: FileResult object with download information
+            writer: Optional callable (e.g. sys.stdout.write) that is fed
+                the decoded content chunk by chunk as it arrives, instead
+                of the whole file being returned as one string
 
         Returns:
-            File content as string
+            File content as string, or None when a writer is given
         """
         url = file_result.get_download_url()
 
         try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.text
+            if writer is None:
+                response = self.session.get(url, timeout=30)
+                response.raise_for_status()
+                return response.text
+
+            response = self.session.get(url, timeout=30, stream=True)
+
+            with response:
+                response.raise_for_status()
+                decoder = codecs.getincrementaldecoder(
+                    response.encoding or 'utf-8'
+                )(errors='replace')
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    text = decoder.decode(chunk)
+                    if text:
+                        writer(text)
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                writer(tail)
+            return None
 
         except requests.exceptions.RequestException as e:
             raise Exception(
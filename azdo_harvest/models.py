@@ -1,9 +1,12 @@
 """Data models for Azure DevOps Harvester."""
 from dataclasses import dataclass
 from typing import Optional
+from urllib.parse import quote, urlencode
 
+DEFAULT_API_VERSION = "7.1"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class FileResult:
     """Represents a file found in Azure DevOps search results.
 
@@ -21,7 +24,12 @@ class FileResult:
     organization: str
     filename: str
 
-    def get_download_url(self, api_version: str = "7.1") -> str:
+    @property
+    def download_url(self) -> str:
+        """Git Items API URL for the default API version."""
+        return self._build_url(DEFAULT_API_VERSION)
+
+    def get_download_url(self, api_version: str = DEFAULT_API_VERSION) -> str:
         """Generate the Azure DevOps API URL to download this file.
 
         Args:
@@ -30,22 +38,41 @@ class FileResult:
         Returns:
             Complete URL for the Git Items API
         """
+        return self._build_url(api_version)
 
-        repo_identifier = self.repository_id or self.repository
+    def _build_url(self, api_version: str) -> str:
+        """Build the Git Items API URL for the given API version.
+
+        Path segments and query values are percent-encoded so that
+        spaces, '#' or '?' in names, paths or branches don't break the
+        request.
+        """
+        query = urlencode(
+            self.get_download_params(api_version), safe='/', quote_via=quote
+        )
+        return f"{self.get_items_url()}?{query}"
 
-        url = (
-            f"https://dev.azure.com/{self.organization}/{self.project}/"
-            f"_apis/git/repositories/{repo_identifier}/items"
-            f"?path={self.filepath}"
-            f"&versionDescriptor.version={self.branch}"
-            f"&includeContent=true"
-            f"&api-version={api_version}"
+    def get_items_url(self) -> str:
+        """Git Items API endpoint of this file's repository, without query.
+
+        The project and repository path segments are percent-encoded.
+        """
+        repo_identifier = self.repository_id or self.repository
+        return (
+            f"https://dev.azure.com/{self.organization}/"
+            f"{quote(self.project, safe='')}/_apis/git/repositories/"
+            f"{quote(repo_identifier, safe='')}/items"
         )
-        return url
 
-    def get_download_params(self) -> dict:
+    def get_download_params(
+        self,
+        api_version: str = DEFAULT_API_VERSION
+    ) -> dict:
         """Get parameters for downloading this file.
 
+        Args:
+            api_version: API version to use (default: 7.1)
+
         Returns:
             Dictionary with download parameters for the API
         """
@@ -53,7 +80,7 @@ class FileResult:
             "path": self.filepath,
             "versionDescriptor.version": self.branch,
             "includeContent": "true",
-            "api-version": "7.1"
+            "api-version": api_version
         }
 
     def __str__(self) -> str:
@@ -61,7 +88,7 @@ class FileResult:
         return f"{self.repository}:{self.filepath} (branch: {self.branch})"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RepositoryResult:
     """Represents a repository found in Azure DevOps search results."""
     name: str
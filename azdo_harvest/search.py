@@ -1,21 +1,34 @@
 """Azure DevOps search functionality using the REST API."""
 import base64
+import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Any
 from azdo_harvest.models import FileResult
 from azdo_harvest.downloader import FileDownloader
 
+# Largest $top the Code Search API accepts per request
+MAX_PAGE_SIZE = 1000
+# Concurrent page requests for searches spanning several pages
+PAGE_WORKERS = 4
+
 
 class AzureDevOpsSearcher:
     """Client for searching Azure DevOps repositories and files."""
 
     def __init__(self, organization: str, project: str,
-                 personal_access_token: str):
+                 personal_access_token: str,
+                 session: Optional[requests.Session] = None,
+                 max_connections: Optional[int] = None):
         """Initialize the Azure DevOps searcher.
 
         Args:
             organization: Azure DevOps organization name
             personal_access_token: Personal Access Token for authentication
+            session: Optional pre-configured session shared by searches
+                and downloads (default: a pooled session is created)
+            max_connections: Keep-alive connections in the download pool;
+                with a supplied session, the pool size of its adapters
         """
 
         self.organization = organization
@@ -28,7 +41,11 @@ class AzureDevOpsSearcher:
             "Authorization": f"Basic {b64_auth}",
             "Content-Type": "application/json"
         }
-        self.downloader = FileDownloader(self.headers)
+        self.downloader = FileDownloader(
+            self.headers, max_connections=max_connections, session=session
+        )
+        # Searches share the downloader's keep-alive connection pool
+        self.session = self.downloader.session
 
     def search(
         self,
@@ -56,6 +73,9 @@ class AzureDevOpsSearcher:
             'files': []
         }
 
+        if search_repos and search_files:
+            return self._search_combined(search_term, project, max_results)
+
         if search_repos:
             results['repositories'] = self._search_repositories(
                 search_term, project, max_results
@@ -68,6 +88,37 @@ class AzureDevOpsSearcher:
 
         return results
 
+    def _search_combined(
+        self,
+        search_term: str,
+        project: Optional[str] = None,
+        max_results: int = 100
+    ) -> Dict[str, List]:
+        """Search for repositories and files with a single request.
+
+        Code search results already carry repository metadata, so both
+        result types are built from one response.
+
+        Args:
+            search_term: The term to search for
+            project: Optional project to limit search scope
+            max_results: Maximum number of results
+
+        Returns:
+            Dictionary with 'repositories' and 'files' keys
+        """
+        try:
+            results = self._fetch_code_search_results(
+                search_term, project, max_results
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to search: {str(e)}")
+
+        return {
+            'repositories': self._parse_repositories(results),
+            'files': self._parse_files(results)
+        }
+
     def _search_repositories(
         self,
         search_term: str,
@@ -84,47 +135,15 @@ class AzureDevOpsSearcher:
         Returns:
             List of repository information
         """
-        url = f"{self.search_url}/_apis/search/codesearchresults"
-        params = {"api-version": "7.1-preview.1"}
-
-        payload = {
-            "searchText": search_term,
-            "$top": max_results,
-            "$skip": 0
-        }
-
-        if project:
-            payload["filters"] = {
-                "Project": [project]
-            }
-
         try:
-            response = requests.post(
-                url,
-                headers=self.headers,
-                json=payload,
-                params=params,
-                timeout=30
+            results = self._fetch_code_search_results(
+                search_term, project, max_results
             )
-            response.raise_for_status()
-            data = response.json()
-
-            repositories = []
-            for result in data.get('results', []):
-                repo_info = {
-                    'name': result.get('repository', {}).get('name', 'N/A'),
-                    'project': result.get('project', {}).get('name', 'N/A'),
-                    'url': result.get('repository', {}).get(
-                        'remoteUrl', 'N/A'
-                    )
-                }
-                repositories.append(repo_info)
-
-            return repositories
-
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to search repositories: {str(e)}")
 
+        return self._parse_repositories(results)
+
     def _search_code(
         self,
         search_term: str,
@@ -141,13 +160,79 @@ class AzureDevOpsSearcher:
         Returns:
             List of FileResult objects with download information
         """
+        try:
+            results = self._fetch_code_search_results(
+                search_term, project, max_results
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to search code: {str(e)}")
+
+        return self._parse_files(results)
+
+    def _fetch_code_search_results(
+        self,
+        search_term: str,
+        project: Optional[str],
+        max_results: int
+    ) -> List[Dict[str, Any]]:
+        """Collect up to max_results code search results across pages.
+
+        The API returns at most MAX_PAGE_SIZE results per request. The
+        first page reports the total match count, and any further pages
+        needed are then fetched concurrently.
+
+        Args:
+            search_term: The term to search for
+            project: Optional project to limit search scope
+            max_results: Maximum number of results
+
+        Returns:
+            The combined 'results' entries of all pages, in order
+        """
+        first_top = min(max_results, MAX_PAGE_SIZE)
+        data = self._post_code_search(search_term, project, first_top, 0)
+        results = data.get('results', [])
+
+        total = min(max_results, data.get('count', len(results)))
+        if len(results) < first_top or total <= first_top:
+            return results[:max_results]
+
+        def fetch_page(skip):
+            top = min(MAX_PAGE_SIZE, total - skip)
+            return self._post_code_search(search_term, project, top, skip)
+
+        skips = range(first_top, total, MAX_PAGE_SIZE)
+        with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+            for page in executor.map(fetch_page, skips):
+                results.extend(page.get('results', []))
+
+        return results
+
+    def _post_code_search(
+        self,
+        search_term: str,
+        project: Optional[str],
+        top: int,
+        skip: int = 0
+    ) -> Dict[str, Any]:
+        """Issue a request to the Code Search API.
+
+        Args:
+            search_term: The term to search for
+            project: Optional project to limit search scope
+            top: Number of results to return (at most MAX_PAGE_SIZE)
+            skip: Number of results to skip
+
+        Returns:
+            Decoded JSON response body
+        """
         url = f"{self.search_url}/_apis/search/codesearchresults"
         params = {"api-version": "7.1-preview.1"}
 
         payload = {
             "searchText": search_term,
-            "$top": max_results,
-            "$skip": 0
+            "$top": top,
+            "$skip": skip
         }
 
         if project:
@@ -155,47 +240,89 @@ class AzureDevOpsSearcher:
                 "Project": [project]
             }
 
-        try:
-            response = requests.post(
-                url,
-                headers=self.headers,
-                json=payload,
-                params=params,
-                timeout=30
+        # Content-Type is already set on the session; json.loads takes
+        # the raw body bytes directly, skipping the response.text decode
+        # Accept is set per request: on the shared session it would make
+        # Git Items downloads return JSON metadata instead of file content
+        response = self.session.post(
+            url,
+            headers={"Accept": "application/json"},
+            data=json.dumps(payload),
+            params=params,
+            timeout=30
+        )
+        response.raise_for_status()
+        return json.loads(response.content)
+
+    def _parse_repositories(
+        self,
+        results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Extract the distinct repositories from code search results.
+
+        Args:
+            results: The 'results' list of a code search response
+
+        Returns:
+            List of repository information, one entry per repository
+        """
+        repositories = []
+        seen = set()
+        for result in results:
+            repository = result.get('repository', {})
+            project = result.get('project', {})
+            key = repository.get('id') or (
+                project.get('name'), repository.get('name')
             )
-            response.raise_for_status()
-            data = response.json()
-
-            files = []
-            for result in data.get('results', []):
-                # Extract version information
-                versions = result.get('versions', [])
-                if versions:
-                    branch = versions[0].get('branchName', 'main')
-                    commit_id = versions[0].get('changeId')
-                else:
-                    branch = 'main'
-                    commit_id = None
-
-                # Create FileResult object
-                file_result = FileResult(
-                    repository=result.get('repository', {}).get(
-                        'name', 'N/A'
-                    ),
-                    repository_id=result.get('repository', {}).get('id'),
-                    project=result.get('project', {}).get('name', 'N/A'),
-                    project_id=result.get('project', {}).get(
-                        'id', '00000000-0000-0000-0000-000000000000'
-                    ),
-                    filepath=result.get('path', 'N/A'),
-                    branch=branch,
-                    commit_id=commit_id,
-                    organization=self.organization,
-                    filename=result.get('fileName', 'N/A')
-                )
-                files.append(file_result)
-
-            return files
+            if key in seen:
+                continue
+            seen.add(key)
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to search code: {str(e)}")
+            repositories.append({
+                'name': repository.get('name', 'N/A'),
+                'project': project.get('name', 'N/A'),
+                'url': repository.get('remoteUrl', 'N/A')
+            })
+
+        return repositories
+
+    def _parse_files(
+        self,
+        results: List[Dict[str, Any]]
+    ) -> List[FileResult]:
+        """Build FileResult objects from code search results.
+
+        Args:
+            results: The 'results' list of a code search response
+
+        Returns:
+            List of FileResult objects with download information
+        """
+        files = []
+        for result in results:
+            # Extract version information
+            versions = result.get('versions', [])
+            if versions:
+                branch = versions[0].get('branchName', 'main')
+                commit_id = versions[0].get('changeId')
+            else:
+                branch = 'main'
+                commit_id = None
+
+            # Create FileResult object
+            file_result = FileResult(
+                repository=result.get('repository', {}).get('name', 'N/A'),
+                repository_id=result.get('repository', {}).get('id'),
+                project=result.get('project', {}).get('name', 'N/A'),
+                project_id=result.get('project', {}).get(
+                    'id', '00000000-0000-0000-0000-000000000000'
+                ),
+                filepath=result.get('path', 'N/A'),
+                branch=branch,
+                commit_id=commit_id,
+                organization=self.organization,
+                filename=result.get('fileName', 'N/A')
+            )
+            files.append(file_result)
+
+        return files
@@ -39,7 +39,7 @@ def main():
         print(f"  Project: {file.project}")
         print(f"  Path: {file.filepath}")
         print(f"  Branch: {file.branch}")
-        print(f"  Download URL: {file.get_download_url()}")
+        print(f"  Download URL: {file.download_url}")
     
     # Example 2: Download a file
     if results['files']:
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 """Example: Download files from Azure DevOps search results."""
 
+import logging
 import os
+import posixpath
+import sys
+from itertools import groupby
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from azdo_harvest import AzureDevOpsSearcher
 
+log = logging.getLogger("azdo_harvest.examples")
+
 
 def main():
     """Search for Dockerfiles and download them."""
@@ -16,8 +25,18 @@ def main():
         print("Error: AZDO_PAT environment variable not set")
         return
     
+    # One pooled keep-alive session for the search and every download
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    ))
+
     # Initialize searcher
-    searcher = AzureDevOpsSearcher(organization, project, pat)
+    searcher = AzureDevOpsSearcher(
+        organization, project, pat, session=session, max_connections=64
+    )
     
     # Search for Dockerfiles
     print("Searching for Dockerfiles...")
@@ -35,46 +54,94 @@ def main():
     
     print(f"\nFound {len(results['files'])} Dockerfile(s):\n")
     
-    # Display all results with download information
+    # Display all results with download information, built up as one
+    # buffer and written in a single call
+    lines = []
     for i, file_result in enumerate(results['files'], 1):
-        print(f"{i}. {file_result}")
-        print(f"   Repository: {file_result.repository}")
-        print(f"   Repository ID: {file_result.repository_id}")
-        print(f"   Project: {file_result.project}")
-        print(f"   Project ID: {file_result.project_id}")
-        print(f"   Path: {file_result.filepath}")
-        print(f"   Branch: {file_result.branch}")
-        print(f"   Commit: {file_result.commit_id}")
-        print(f"   Organization: {file_result.organization}")
-        print(f"   Filename: {file_result.filename}")
-        print(f"   Download URL: {file_result.get_download_url()}")
-        print()
+        lines += [
+            f"{i}. {file_result}",
+            f"   Repository: {file_result.repository}",
+            f"   Repository ID: {file_result.repository_id}",
+            f"   Project: {file_result.project}",
+            f"   Project ID: {file_result.project_id}",
+            f"   Path: {file_result.filepath}",
+            f"   Branch: {file_result.branch}",
+            f"   Commit: {file_result.commit_id}",
+            f"   Organization: {file_result.organization}",
+            f"   Filename: {file_result.filename}",
+            f"   Download URL: {file_result.download_url}",
+            "",
+        ]
+    sys.stdout.write("\n".join(lines) + "\n")
     
-    # Download all files
+    # Download all files (up to 8 at a time over the shared session);
+    # files already fetched from the same commit by an earlier run are
+    # skipped
     print("\nDownloading files...")
-    downloaded = searcher.downloader.download_files(
-        results['files'],
+    downloaded = {}
+    single_files = []
+
+    # Several files under one folder of a repository are fetched as a
+    # single folder zip instead of one request each
+    def repo_and_branch(file_result):
+        return (
+            file_result.repository_id or file_result.repository,
+            file_result.branch
+        )
+
+    for _, group in groupby(
+        sorted(results['files'], key=repo_and_branch), key=repo_and_branch
+    ):
+        group = list(group)
+        folders = [posixpath.dirname(f.filepath) for f in group]
+        # Results without a usable path fall back to 'N/A', which is not
+        # absolute; posixpath.commonpath rejects such a mix
+        if (
+            len(group) >= 3
+            and all(folder.startswith('/') for folder in folders)
+            and posixpath.commonpath(folders) != '/'
+        ):
+            try:
+                downloaded.update(searcher.downloader.download_tree(
+                    group, output_dir="./downloads", skip_unchanged=True
+                ))
+                continue
+            except Exception as e:
+                print(f"Folder download failed, fetching files: {e}")
+        single_files.extend(group)
+
+    downloaded.update(searcher.downloader.download_files(
+        single_files,
         output_dir="./downloads",
-        preserve_structure=True
-    )
+        preserve_structure=True,
+        max_workers=8,
+        skip_unchanged=True
+    ))
     
-    print("\nDownload Summary:")
+    # Summary lines go through logging, which only formats enabled records
+    log.info("\nDownload Summary:")
     for source, dest in downloaded.items():
         if dest:
-            print(f"✓ {source} → {dest}")
+            log.info("✓ %s → %s", source, dest)
         else:
-            print(f"✗ {source} → Failed")
+            log.info("✗ %s → Failed", source)
     
     # Show file contents
     print("\n" + "=" * 70)
     print("First Dockerfile content:")
     print("=" * 70)
     try:
-        content = searcher.downloader.get_file_content(results['files'][0])
-        print(content)
+        # Stream straight to stdout instead of holding the whole file
+        searcher.downloader.get_file_content(
+            results['files'][0], writer=sys.stdout.write
+        )
+        print()
     except Exception as e:
         print(f"Error: {e}")
 
 
 if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO, format="%(message)s", stream=sys.stdout
+    )
     main()
@@ -0,0 +1,75 @@
+"""Shared fakes and fixtures for the test suite."""
+
+import json
+import pytest
+from azdo_harvest.models import FileResult
+
+
+class FakeResponse:
+    """Minimal stand-in for a requests.Response, streamed or not."""
+
+    encoding = None
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a response whose body is data encoded as JSON."""
+        return cls(json.dumps(data).encode("utf-8"))
+
+    @property
+    def content(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def file_result():
+    """A FileResult pointing at a file nested in a repository."""
+    return FileResult(
+        repository="repo",
+        repository_id="repo-id",
+        project="proj",
+        project_id="pid",
+        filepath="/src/Dockerfile",
+        branch="main",
+        commit_id="commit",
+        organization="org",
+        filename="Dockerfile"
+    )
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    """Replace a session's get with a fake.
+
+    Call it with the session and either the response body as bytes, or
+    a callable building the response from the requested URL. It returns
+    the list of requests made, each as its keyword arguments plus "url".
+    """
+    def install(session, response):
+        calls = []
+
+        def get(url, **kwargs):
+            calls.append({"url": url, **kwargs})
+            if callable(response):
+                return response(url)
+            return FakeResponse(response)
+
+        monkeypatch.setattr(session, "get", get)
+        return calls
+
+    return install
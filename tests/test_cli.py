@@ -0,0 +1,24 @@
+"""Tests for the CLI download helpers."""
+
+import hashlib
+from dataclasses import replace
+from azdo_harvest.cli import download_files_parallel
+from azdo_harvest.search import AzureDevOpsSearcher
+
+
+class TestDownloadFilesParallel:
+    """Tests for download_files_parallel."""
+
+    def test_hash_is_computed_over_raw_bytes(self, tmp_path, fake_get,
+                                             file_result):
+        """Test that the filename hash is the SHA-256 of the bytes on disk."""
+        body = b"\xff\xfeFROM scratch\n" * 5000
+        searcher = AzureDevOpsSearcher("org", "proj", "pat")
+        fake_get(searcher.downloader.session, body)
+        file_result = replace(file_result, filepath="/Dockerfile")
+
+        download_files_parallel(searcher, [file_result], str(tmp_path))
+
+        expected = f"repo__Dockerfile__{hashlib.sha256(body).hexdigest()[:8]}"
+        assert [p.name for p in tmp_path.iterdir()] == [expected]
+        assert (tmp_path / expected).read_bytes() == body
@@ -0,0 +1,361 @@
+"""Tests for FileDownloader."""
+
+import io
+import os
+import pytest
+import requests
+import stat
+import threading
+import zipfile
+from dataclasses import replace
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from azdo_harvest.downloader import (
+    MANIFEST_NAME, FileDownloader, hashed_filename, load_manifest,
+    unique_file_results
+)
+from tests.conftest import FakeResponse
+
+
+class TestFileDownloader:
+    """Tests for FileDownloader."""
+
+    def test_session_uses_auth_headers(self):
+        """Test that the shared session carries the auth headers."""
+        downloader = FileDownloader({"Authorization": "Basic abc"})
+
+        assert downloader.session.headers["Authorization"] == "Basic abc"
+
+    def test_session_retries_transient_errors(self):
+        """Test that the https adapter retries throttling responses."""
+        downloader = FileDownloader({})
+
+        adapter = downloader.session.get_adapter("https://dev.azure.com")
+        assert adapter.max_retries.total == 3
+        assert 429 in adapter.max_retries.status_forcelist
+
+    def test_download_files_keeps_input_order(self, tmp_path, fake_get,
+                                              file_result):
+        """Test that parallel downloads report results in input order."""
+        files = [
+            replace(file_result, filepath=f"/src/{i}.txt", filename=f"{i}.txt")
+            for i in range(20)
+        ]
+        downloader = FileDownloader({})
+        fake_get(downloader.session, b"data")
+
+        downloaded = downloader.download_files(files, output_dir=tmp_path)
+
+        assert list(downloaded) == [str(f) for f in files]
+        assert downloaded[str(files[3])] == str(
+            tmp_path / "repo" / "src" / "3.txt"
+        )
+
+    def test_download_files_same_target_is_not_interleaved(
+        self, tmp_path, fake_get, file_result
+    ):
+        """Test that results sharing a target path leave one whole file."""
+        # Force the two downloads to alternate chunk by chunk
+        barrier = threading.Barrier(2, timeout=5)
+
+        class MainResponse(FakeResponse):
+            def iter_content(self, chunk_size=1):
+                yield b"m" * 65536
+                barrier.wait()
+                barrier.wait()
+                yield b"m" * 65536
+
+        class ReleaseResponse(FakeResponse):
+            def iter_content(self, chunk_size=1):
+                barrier.wait()
+                yield b"r" * 65536
+                barrier.wait()
+
+        downloader = FileDownloader({})
+        fake_get(
+            downloader.session,
+            lambda url: (
+                ReleaseResponse(b"") if "release" in url
+                else MainResponse(b"")
+            )
+        )
+        files = [replace(file_result, branch=b) for b in ("main", "release")]
+
+        downloader.download_files(files, output_dir=tmp_path)
+
+        target = tmp_path / "repo" / "src" / "Dockerfile"
+        assert target.read_bytes() in (b"m" * 131072, b"r" * 65536)
+        assert [p.name for p in target.parent.iterdir()] == ["Dockerfile"]
+
+    def test_skip_unchanged_reuses_previous_download(self, tmp_path,
+                                                     fake_get,
+                                                     file_result):
+        """Test that files from an already-downloaded commit are skipped."""
+        downloader = FileDownloader({})
+        calls = fake_get(downloader.session, b"data")
+
+        first = downloader.download_files(
+            [file_result], output_dir=tmp_path, skip_unchanged=True
+        )
+        second = downloader.download_files(
+            [file_result], output_dir=tmp_path, skip_unchanged=True
+        )
+        downloader.download_files(
+            [replace(file_result, commit_id="newer")],
+            output_dir=tmp_path, skip_unchanged=True
+        )
+
+        assert first == second
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("prefix", ["", "src/"])
+    def test_download_tree_extracts_requested_files(self, tmp_path,
+                                                    fake_get, file_result,
+                                                    prefix):
+        """Test that one folder zip serves several files."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr(f"{prefix}a/one.txt", b"one")
+            archive.writestr(f"{prefix}b/two.txt", b"two")
+            archive.writestr(f"{prefix}b/unrelated.txt", b"skip")
+        downloader = FileDownloader({})
+        requests_made = fake_get(downloader.session, buffer.getvalue())
+        files = [
+            replace(file_result, filepath="/src/a/one.txt"),
+            replace(file_result, filepath="/src/b/two.txt"),
+        ]
+
+        downloaded = downloader.download_tree(files, output_dir=tmp_path)
+
+        assert len(requests_made) == 1
+        assert requests_made[0]["params"]["scopePath"] == "/src"
+        assert list(downloaded.values()) == [
+            str(tmp_path / "repo" / "src" / "a" / "one.txt"),
+            str(tmp_path / "repo" / "src" / "b" / "two.txt"),
+        ]
+        assert (tmp_path / "repo" / "src" / "b" / "two.txt").read_bytes() == (
+            b"two"
+        )
+        assert not (tmp_path / "repo" / "src" / "b" / "unrelated.txt").exists()
+
+    @pytest.mark.parametrize("prefix", ["", "svc/"])
+    def test_download_tree_matches_same_named_files_exactly(
+        self, tmp_path, fake_get, file_result, prefix
+    ):
+        """Test that a nested file never stands in for a shallower one."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr(f"{prefix}api/Dockerfile", b"api")
+            archive.writestr(f"{prefix}Dockerfile", b"root")
+            archive.writestr(f"{prefix}web/Dockerfile", b"web")
+        downloader = FileDownloader({})
+        fake_get(downloader.session, buffer.getvalue())
+        files = [
+            replace(file_result, filepath=path)
+            for path in (
+                "/svc/Dockerfile", "/svc/api/Dockerfile", "/svc/web/Dockerfile"
+            )
+        ]
+
+        downloader.download_tree(files, output_dir=tmp_path)
+
+        svc = tmp_path / "repo" / "svc"
+        assert (svc / "Dockerfile").read_bytes() == b"root"
+        assert (svc / "api" / "Dockerfile").read_bytes() == b"api"
+        assert (svc / "web" / "Dockerfile").read_bytes() == b"web"
+
+    def test_download_tree_skips_unchanged(self, tmp_path, fake_get,
+                                           file_result):
+        """Test that download_tree only fetches files the manifest lacks."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("a/one.txt", b"one")
+            archive.writestr("b/two.txt", b"two")
+        downloader = FileDownloader({})
+        requests_made = fake_get(downloader.session, buffer.getvalue())
+        files = [
+            replace(file_result, filepath="/src/a/one.txt"),
+            replace(file_result, filepath="/src/b/two.txt"),
+        ]
+
+        first = downloader.download_tree(
+            files, output_dir=tmp_path, skip_unchanged=True
+        )
+        second = downloader.download_tree(
+            files, output_dir=tmp_path, skip_unchanged=True
+        )
+        downloader.download_tree(
+            [files[0], replace(files[1], commit_id="newer")],
+            output_dir=tmp_path, skip_unchanged=True
+        )
+
+        assert first == second
+        assert len(requests_made) == 2
+        assert requests_made[1]["params"]["scopePath"] == "/src/b"
+
+    def test_download_tree_without_files(self):
+        """Test that an empty batch makes no request, like download_files."""
+        assert FileDownloader({}).download_tree([]) == {}
+
+    def test_get_file_content_streams_to_writer(self, fake_get,
+                                                file_result):
+        """Test that content is decoded incrementally into the writer."""
+        text = "naïve ☃ content\n" * 10000
+        downloader = FileDownloader({})
+        fake_get(downloader.session, text.encode("utf-8"))
+        chunks = []
+
+        result = downloader.get_file_content(file_result, writer=chunks.append)
+
+        assert result is None
+        assert len(chunks) > 1
+        assert "".join(chunks) == text
+
+    def test_download_file_hashed_honours_umask(self, tmp_path, fake_get,
+                                                file_result):
+        """Test that hash-named files get the same mode as open() gives."""
+        downloader = FileDownloader({})
+        fake_get(downloader.session, b"data")
+        old_umask = os.umask(0o022)
+        try:
+            path, _ = downloader.download_file_hashed(file_result, tmp_path)
+        finally:
+            os.umask(old_umask)
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+    def test_failed_download_closes_response(self, tmp_path, fake_get,
+                                             file_result):
+        """Test that an error response releases its pooled connection."""
+        class ErrorResponse(FakeResponse):
+            closed = False
+
+            def raise_for_status(self):
+                raise requests.exceptions.HTTPError("404 Not Found")
+
+            def __exit__(self, *args):
+                ErrorResponse.closed = True
+
+        downloader = FileDownloader({})
+        fake_get(downloader.session, lambda url: ErrorResponse(b""))
+
+        with pytest.raises(Exception, match="404"):
+            downloader.download_file_hashed(file_result, tmp_path)
+
+        assert ErrorResponse.closed
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failed_replace_removes_part_file(self, tmp_path, fake_get,
+                                              file_result):
+        """Test that a target that cannot be replaced leaves no .part file."""
+        downloader = FileDownloader({})
+        fake_get(downloader.session, b"data")
+        (tmp_path / "repo" / "src" / "Dockerfile").mkdir(parents=True)
+
+        with pytest.raises(Exception, match="Failed to download"):
+            downloader.download_file(file_result, output_dir=tmp_path)
+
+        assert [p.name for p in (tmp_path / "repo" / "src").iterdir()] == [
+            "Dockerfile"
+        ]
+
+    def test_uses_provided_session(self):
+        """Test that a caller-supplied session is used as-is."""
+        session = requests.Session()
+        downloader = FileDownloader(
+            {"Authorization": "Basic abc"}, session=session
+        )
+
+        assert downloader.session is session
+        assert session.headers["Authorization"] == "Basic abc"
+
+    def test_provided_session_honours_max_connections(self):
+        """Test that an explicit max_connections is kept for a session."""
+        downloader = FileDownloader(
+            {}, max_connections=32, session=requests.Session()
+        )
+
+        assert downloader.max_connections == 32
+
+    def test_provided_session_defaults_to_requests_pool_size(self):
+        """Test that an unsized session is assumed to use requests' pool."""
+        downloader = FileDownloader({}, session=requests.Session())
+
+        assert downloader.max_connections == DEFAULT_POOLSIZE
+
+    def test_pool_size_matches_max_connections(self, monkeypatch):
+        """Test that the connection pool is sized from max_connections."""
+        pool_sizes = []
+
+        class RecordingAdapter(HTTPAdapter):
+            def __init__(self, *args, **kwargs):
+                pool_sizes.append(kwargs["pool_maxsize"])
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(
+            "azdo_harvest.downloader.HTTPAdapter", RecordingAdapter
+        )
+
+        downloader = FileDownloader({}, max_connections=8)
+
+        assert pool_sizes == [8]
+        assert downloader.max_connections == 8
+
+    def test_download_file_streams_bytes(self, tmp_path, fake_get,
+                                         file_result):
+        """Test that the response body is written to disk unchanged."""
+        body = b"FROM python:3.12\r\n\xef\xbb\xbf" * 10000
+        downloader = FileDownloader({})
+        fake_get(downloader.session, body)
+
+        path = downloader.download_file(file_result, output_dir=tmp_path)
+
+        assert path == str(tmp_path / "repo" / "src" / "Dockerfile")
+        assert (tmp_path / "repo" / "src" / "Dockerfile").read_bytes() == body
+
+
+class TestHashedFilename:
+    """Tests for hashed_filename."""
+
+    def test_hash_goes_before_extension(self):
+        """Test that the extension is kept after the hash."""
+        name = hashed_filename("repo", "app.config.json", "abcd1234")
+
+        assert name == "repo__app.config__abcd1234.json"
+
+    def test_dotfile_keeps_its_name_as_extension(self):
+        """Test that a leading-dot file keeps the established naming."""
+        assert hashed_filename("repo", ".gitignore", "abcd1234") == (
+            "repo____abcd1234.gitignore"
+        )
+
+    def test_without_extension(self):
+        """Test names for files without an extension."""
+        assert hashed_filename("a/b", "Dockerfile", "abcd1234") == (
+            "a_b__Dockerfile__abcd1234"
+        )
+
+
+class TestUniqueFileResults:
+    """Tests for unique_file_results."""
+
+    def test_drops_repeated_file_versions(self, file_result):
+        """Test that only distinct (repo, commit, path) entries are kept."""
+        other_branch = replace(file_result, branch="release")
+        other_commit = replace(file_result, commit_id="other")
+
+        unique = unique_file_results(
+            [file_result, other_branch, other_commit, file_result]
+        )
+
+        assert unique == [file_result, other_commit]
+
+
+class TestLoadManifest:
+    """Tests for load_manifest."""
+
+    @pytest.mark.parametrize("content", [b"[]", b"null", b"{bad", b"3"])
+    def test_invalid_manifest_is_empty(self, tmp_path, content):
+        """Test that a manifest that is not a JSON object is ignored."""
+        (tmp_path / MANIFEST_NAME).write_bytes(content)
+
+        assert load_manifest(tmp_path) == {}
@@ -1,109 +1,131 @@
 """Tests for FileResult and RepositoryResult models."""
 
+import dataclasses
 import pytest
 from azdo_harvest.models import FileResult, RepositoryResult
 
 
+@pytest.fixture(scope="module")
+def sample_file_result():
+    """A FileResult shared by the tests; variants use dataclasses.replace."""
+    return FileResult(
+        repository="my-repo",
+        repository_id="repo-id-123",
+        project="my-project",
+        project_id="proj-id-456",
+        filepath="/src/app.py",
+        branch="develop",
+        commit_id="commit-789",
+        organization="my-org",
+        filename="app.py"
+    )
+
+
 class TestFileResult:
     """Tests for FileResult dataclass."""
     
-    def test_file_result_creation(self):
+    def test_file_result_creation(self, sample_file_result):
         """Test creating a FileResult object."""
-        file_result = FileResult(
-            repository="test-repo",
-            repository_id="repo-123",
-            project="test-project",
-            project_id="proj-456",
-            filepath="/src/main.py",
-            branch="main",
-            commit_id="abc123",
-            organization="test-org",
-            filename="main.py"
+        assert sample_file_result.repository == "my-repo"
+        assert sample_file_result.filepath == "/src/app.py"
+        assert sample_file_result.branch == "develop"
+        assert sample_file_result.organization == "my-org"
+    
+    def test_get_download_url(self, sample_file_result):
+        """Test generating download URL."""
+        url = sample_file_result.get_download_url()
+        expected = (
+            "https://dev.azure.com/my-org/my-project",
+            "repositories/repo-id-123/items",
+            "path=/src/app.py",
+            "versionDescriptor.version=develop",
+            "includeContent=true",
+            "api-version=7.1",
         )
         
-        assert file_result.repository == "test-repo"
-        assert file_result.filepath == "/src/main.py"
-        assert file_result.branch == "main"
-        assert file_result.organization == "test-org"
+        missing = [part for part in expected if part not in url]
+        assert not missing
     
-    def test_get_download_url(self):
-        """Test generating download URL."""
-        file_result = FileResult(
-            repository="my-repo",
-            repository_id="repo-id-123",
-            project="my-project",
-            project_id="proj-id-456",
-            filepath="/src/app.py",
-            branch="develop",
-            commit_id="commit-789",
-            organization="my-org",
-            filename="app.py"
+    def test_get_download_url_without_repo_id(self, sample_file_result):
+        """Test URL generation when repository ID is None."""
+        file_result = dataclasses.replace(
+            sample_file_result, repository_id=None
         )
         
         url = file_result.get_download_url()
-        
-        assert "https://dev.azure.com/my-org/my-project" in url
-        assert "repositories/repo-id-123/items" in url
-        assert "path=/src/app.py" in url
-        assert "versionDescriptor.version=develop" in url
-        assert "includeContent=true" in url
-        assert "api-version=7.1" in url
+        assert "repositories/my-repo/items" in url
     
-    def test_get_download_url_without_repo_id(self):
-        """Test URL generation when repository ID is None."""
-        file_result = FileResult(
-            repository="my-repo",
+    def test_get_download_url_escapes_special_characters(
+        self, sample_file_result
+    ):
+        """Test that spaces, '#' and '?' are percent-encoded."""
+        file_result = dataclasses.replace(
+            sample_file_result,
+            repository="my repo",
             repository_id=None,
-            project="my-project",
-            project_id="proj-id",
-            filepath="/test.txt",
-            branch="main",
-            commit_id=None,
-            organization="org",
-            filename="test.txt"
+            project="My Project",
+            filepath="/docs/C# notes?.md",
+            branch="feature/x",
+            filename="C# notes?.md"
         )
         
         url = file_result.get_download_url()
-        assert "repositories/my-repo/items" in url
+        
+        assert "dev.azure.com/my-org/My%20Project/" in url
+        assert "repositories/my%20repo/items" in url
+        assert "path=/docs/C%23%20notes%3F.md&" in url
+        assert "versionDescriptor.version=feature/x&" in url
     
-    def test_get_download_params(self):
-        """Test getting download parameters."""
-        file_result = FileResult(
-            repository="repo",
-            repository_id="id",
-            project="proj",
-            project_id="pid",
-            filepath="/file.txt",
-            branch="master",
-            commit_id="commit",
-            organization="org",
-            filename="file.txt"
+    def test_get_items_url(self, sample_file_result):
+        """Test that the download URL is built on the Items endpoint."""
+        items_url = sample_file_result.get_items_url()
+        
+        assert items_url == (
+            "https://dev.azure.com/my-org/my-project"
+            "/_apis/git/repositories/repo-id-123/items"
         )
+        assert sample_file_result.download_url.startswith(items_url + "?")
+    
+    def test_download_url_uses_default_version(self, sample_file_result):
+        """Test that download_url is the default-version download URL."""
+        file_result = sample_file_result
+        
+        assert file_result.get_download_url() == file_result.download_url
+        assert "api-version=7.1" in file_result.download_url
+        assert "api-version=7.0" in file_result.get_download_url("7.0")
+        
+        moved = dataclasses.replace(file_result, branch="main")
+        assert "versionDescriptor.version=main" in moved.download_url
+    
+    def test_asdict_round_trips(self, sample_file_result):
+        """Test that a FileResult can be rebuilt from asdict()."""
+        data = dataclasses.asdict(sample_file_result)
         
-        params = file_result.get_download_params()
+        assert "download_url" not in data
+        assert FileResult(**data) == sample_file_result
+    
+    def test_file_result_is_frozen_and_hashable(self, sample_file_result):
+        """Test that FileResult is immutable and usable in sets."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            sample_file_result.branch = "main"
+        copy = dataclasses.replace(sample_file_result)
+        assert len({sample_file_result, copy}) == 1
+        assert not hasattr(sample_file_result, "__dict__")
+    
+    def test_get_download_params(self, sample_file_result):
+        """Test getting download parameters."""
+        params = sample_file_result.get_download_params()
         
-        assert params["path"] == "/file.txt"
-        assert params["versionDescriptor.version"] == "master"
+        assert params["path"] == "/src/app.py"
+        assert params["versionDescriptor.version"] == "develop"
         assert params["includeContent"] == "true"
         assert params["api-version"] == "7.1"
     
-    def test_str_representation(self):
+    def test_str_representation(self, sample_file_result):
         """Test string representation."""
-        file_result = FileResult(
-            repository="my-repo",
-            repository_id="id",
-            project="proj",
-            project_id="pid",
-            filepath="/src/code.py",
-            branch="main",
-            commit_id="commit",
-            organization="org",
-            filename="code.py"
-        )
-        
-        str_repr = str(file_result)
-        assert "my-repo:/src/code.py" in str_repr
-        assert "main" in str_repr
+        str_repr = str(sample_file_result)
+        assert "my-repo:/src/app.py" in str_repr
+        assert "develop" in str_repr
 
 
 class TestRepositoryResult:
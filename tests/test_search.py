@@ -0,0 +1,112 @@
+"""Tests for AzureDevOpsSearcher."""
+
+import json
+import pytest
+from azdo_harvest.search import AzureDevOpsSearcher
+from tests.conftest import FakeResponse
+
+
+def make_result(repo_id, repo_name, path):
+    """Build a single code search API result entry."""
+    return {
+        "fileName": path.rsplit("/", 1)[-1],
+        "path": path,
+        "project": {"id": "proj-id", "name": "proj"},
+        "repository": {
+            "id": repo_id,
+            "name": repo_name,
+            "remoteUrl": f"https://dev.azure.com/org/proj/_git/{repo_name}"
+        },
+        "versions": [{"branchName": "main", "changeId": "abc123"}]
+    }
+
+
+@pytest.fixture
+def searcher():
+    """An AzureDevOpsSearcher for a test organization."""
+    return AzureDevOpsSearcher("org", "proj", "pat")
+
+
+class TestSearcherInit:
+    """Tests for AzureDevOpsSearcher construction."""
+
+    def test_search_shares_download_session(self, searcher):
+        """Test that searches reuse the downloader's connection pool."""
+        assert searcher.session is searcher.downloader.session
+
+    def test_session_does_not_force_json_accept(self, searcher):
+        """Test that Git Items downloads are not asked for JSON metadata."""
+        assert "application/json" not in searcher.session.headers.get(
+            "Accept", ""
+        )
+
+
+class TestSearch:
+    """Tests for AzureDevOpsSearcher.search."""
+
+    def test_combined_search_uses_one_request(self, searcher, monkeypatch):
+        """Test that repos and files are built from a single POST."""
+        data = {"results": [
+            make_result("r1", "api", "/Dockerfile"),
+            make_result("r1", "api", "/src/Dockerfile"),
+            make_result("r2", "web", "/Dockerfile"),
+        ]}
+        calls = []
+
+        def fake_post(url, **kwargs):
+            calls.append(json.loads(kwargs["data"]))
+            assert kwargs["headers"] == {"Accept": "application/json"}
+            return FakeResponse.from_json(data)
+
+        monkeypatch.setattr(searcher.session, "post", fake_post)
+
+        results = searcher.search("file:Dockerfile", project="proj")
+
+        assert len(calls) == 1
+        assert calls[0]["filters"] == {"Project": ["proj"]}
+        assert [r["name"] for r in results["repositories"]] == ["api", "web"]
+        assert [f.filepath for f in results["files"]] == [
+            "/Dockerfile", "/src/Dockerfile", "/Dockerfile"
+        ]
+        assert results["files"][0].commit_id == "abc123"
+
+    def test_large_searches_are_paginated(self, searcher, monkeypatch):
+        """Test that max_results above the page size spans several pages."""
+        total = 2500
+        calls = []
+
+        def fake_post(url, **kwargs):
+            payload = json.loads(kwargs["data"])
+            calls.append((payload["$skip"], payload["$top"]))
+            stop = min(payload["$skip"] + payload["$top"], total)
+            return FakeResponse.from_json({"count": total, "results": [
+                make_result("r1", "api", f"/file{i}")
+                for i in range(payload["$skip"], stop)
+            ]})
+
+        monkeypatch.setattr(searcher.session, "post", fake_post)
+
+        results = searcher.search("x", search_repos=False, max_results=5000)
+
+        assert sorted(calls) == [(0, 1000), (1000, 1000), (2000, 500)]
+        assert [f.filepath for f in results["files"]] == [
+            f"/file{i}" for i in range(total)
+        ]
+
+    def test_small_result_set_uses_one_request(self, searcher, monkeypatch):
+        """Test that a short first page stops pagination."""
+        calls = []
+
+        def fake_post(url, **kwargs):
+            calls.append(json.loads(kwargs["data"]))
+            return FakeResponse.from_json({"count": 1, "results": [
+                make_result("r1", "api", "/Dockerfile")
+            ]})
+
+        monkeypatch.setattr(searcher.session, "post", fake_post)
+
+        results = searcher.search("x", search_repos=False, max_results=5000)
+
+        assert len(calls) == 1
+        assert calls[0]["$top"] == 1000
+        assert len(results["files"]) == 1